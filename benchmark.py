@@ -0,0 +1,126 @@
+# flake8: noqa: E501
+import os
+import tempfile
+import time
+import numpy as np
+from click import echo, secho
+from camera import AlviumCamera
+from capture import FrameRecorder
+from downscale import SoftwareDownscaler
+from scheduling import SCHEDULING_SUPPORTED, ThreadTuning, set_switch_interval
+
+WARMUP_DURATION = 2  # In s
+
+
+def latency_stats(latencies: list[tuple[int, int]]) -> dict[str, float]:
+    """
+    Compute the callback latency jitter (in µs) from the (host time, camera timestamp) in ns of each frame.
+    The camera timestamps are assumed to be in ns (which is the case of the Alvium cameras), so the latency is only known up to a constant: it is given relative to the fastest frame.
+    The host and camera clocks drift apart, so the linear trend of the latency over the recording is removed first.
+    """
+    if len(latencies) < 2:
+        raise ValueError(
+            "at least 2 frames with a timestamp are needed to compute the latency jitter, check that the camera is streaming."
+        )
+    host, device = np.array(latencies, dtype=np.int64).T
+    device_time = (device - device[0]) / 1e9  # In s
+    latency = ((host - host[0]) - (device - device[0])) / 1000  # In µs
+    slope, intercept = np.polyfit(device_time, latency, 1)
+    latency -= slope * device_time + intercept
+    latency -= latency.min()
+    intervals = np.diff(host) / 1000
+    return {
+        "frames": len(latencies),
+        "latency_mean": latency.mean(),
+        "latency_std": latency.std(),
+        "latency_p99": np.percentile(latency, 99),
+        "latency_max": latency.max(),
+        "interval_std": intervals.std(),
+    }
+
+
+def run_capture(
+    camera: AlviumCamera,
+    downscaler: SoftwareDownscaler,
+    duration: float,
+    capture_tuning: ThreadTuning = None,
+    writer_tuning: ThreadTuning = None,
+) -> tuple[dict[str, float], int]:
+    """Record a throwaway video for the given duration (in s) and return the latency stats and the number of incomplete frames."""
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = FrameRecorder(
+            camera,
+            os.path.join(directory, "benchmark.avi"),
+            downscaler,
+            capture_tuning,
+            writer_tuning,
+            measure_latency=True,
+        )
+        recorder.start()
+        time.sleep(duration)
+        recorder.stop()
+        recorder.wait()
+    return latency_stats(recorder.latencies), recorder.incomplete
+
+
+def benchmark_capture(
+    camera: AlviumCamera,
+    downscaler: SoftwareDownscaler,
+    duration: float,
+    capture_tuning: ThreadTuning,
+    writer_tuning: ThreadTuning,
+    switch_interval: float = None,
+):
+    """Compare the callback latency jitter of the capture pipeline with and without the scheduling settings, and print the results."""
+    # Without any setting that can be applied, both runs would be the same and the table would only show noise
+    tunings_applied = SCHEDULING_SUPPORTED and not (
+        capture_tuning.is_default and writer_tuning.is_default
+    )
+    if not tunings_applied and switch_interval is None:
+        secho(
+            "Nothing to compare: give at least one scheduling option (cores, priorities or switch interval) that can be applied on this platform.",
+            fg="red",
+        )
+        return
+
+    try:
+        # A first discarded recording so that the warm-up of the camera, encoder and disk doesn't count against the first measured run
+        secho(f"Warming up for {WARMUP_DURATION:.0f} s...", fg="yellow")
+        run_capture(camera, downscaler, WARMUP_DURATION)
+
+        secho(f"Recording {duration:.0f} s with the default settings...", fg="yellow")
+        default_stats, default_incomplete = run_capture(camera, downscaler, duration)
+
+        secho(f"Recording {duration:.0f} s with the tuned settings...", fg="yellow")
+        previous_interval = set_switch_interval(switch_interval)
+        try:
+            tuned_stats, tuned_incomplete = run_capture(
+                camera, downscaler, duration, capture_tuning, writer_tuning
+            )
+        finally:
+            set_switch_interval(previous_interval)
+    except (ValueError, RuntimeError) as e:
+        secho(f"Benchmark failed: {e}", fg="red")
+        return
+
+    echo()
+    secho("- Callback latency jitter -", fg="green", bold=True)
+    secho(f"{'':<28}{'Default':>12}{'Tuned':>12}", fg="green")
+    rows = [
+        ("Frames received", "frames", ""),
+        ("Latency mean (µs)", "latency_mean", ".1f"),
+        ("Latency std (µs)", "latency_std", ".1f"),
+        ("Latency p99 (µs)", "latency_p99", ".1f"),
+        ("Latency max (µs)", "latency_max", ".1f"),
+        ("Frame interval std (µs)", "interval_std", ".1f"),
+    ]
+    for label, key, fmt in rows:
+        secho(
+            f"{label:<28}{default_stats[key]:>12{fmt}}{tuned_stats[key]:>12{fmt}}",
+            fg="green",
+        )
+    secho(
+        f"{'Incomplete frames':<28}{default_incomplete:>12}{tuned_incomplete:>12}",
+        fg="green",
+    )
+    echo()
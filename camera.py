@@ -1,5 +1,5 @@
 # flake8: noqa: E501
-from vmbpy import VmbSystem, PixelFormat
+from vmbpy import VmbSystem, PixelFormat, VmbFeatureError
 from utils import cleanup_after_exception
 
 # TODO: Add a Camera interface to use different type of cameras (maybe to support the PC webcam or the Basler cameras?).
@@ -297,6 +297,150 @@ class AlviumCamera:
             self.__camera.BinningHorizontal.set(1)
             self.__camera.BinningVertical.set(1)
 
+    @property
+    @cleanup_after_exception
+    def binning_selectors(self) -> list[str]:
+        """Get the binning selectors (like Sensor or Digital) supported by the camera."""
+        self.__check_camera_and_vmbsyst()
+        selector = self.__get_feature("BinningSelector")
+        if selector is None or not selector.is_writeable():
+            return []
+        return [str(entry) for entry in selector.get_available_entries()]
+
+    @property
+    @cleanup_after_exception
+    def binning_selector(self) -> str:
+        """Get the current binning selector."""
+        self.__check_camera_and_vmbsyst()
+        return str(self.__camera.BinningSelector.get())
+
+    @binning_selector.setter
+    @cleanup_after_exception
+    def binning_selector(self, value: str):
+        """Set the binning selector, the binning factor needs to be 1 to change it."""
+        self.__check_camera_and_vmbsyst()
+        selectors = self.binning_selectors
+        if value not in selectors:
+            raise ValueError(f"Binning selector must be one of {selectors}.")
+        self.__camera.BinningSelector.set(value)
+
+    @property
+    @cleanup_after_exception
+    def binning_factor(self) -> int:
+        """Get the current binning factor (the same is used horizontally and vertically)."""
+        self.__check_camera_and_vmbsyst()
+        return self.__camera.BinningHorizontal.get()
+
+    @property
+    @cleanup_after_exception
+    def binning_factor_range(self) -> tuple[int, int]:
+        """Get the range of binning factors supported by the camera with the current binning selector."""
+        self.__check_camera_and_vmbsyst()
+        if not self.__camera.BinningHorizontal.is_writeable():
+            return (1, 1)
+        horizontal_range = self.__camera.BinningHorizontal.get_range()
+        vertical_range = self.__camera.BinningVertical.get_range()
+        return (
+            max(horizontal_range[0], vertical_range[0]),
+            min(horizontal_range[1], vertical_range[1]),
+        )
+
+    @binning_factor.setter
+    @cleanup_after_exception
+    def binning_factor(self, value: int):
+        """Set the binning factor (the same is used horizontally and vertically)."""
+        self.__check_camera_and_vmbsyst()
+        factor_range = self.binning_factor_range
+        if value < factor_range[0] or value > factor_range[1]:
+            raise ValueError(f"Binning factor must be within the range {factor_range}.")
+        if not self.__camera.BinningHorizontal.is_writeable():
+            return  # Only a factor of 1 can get here, which is what the camera already does
+        self.__camera.BinningHorizontal.set(value)
+        self.__camera.BinningVertical.set(value)
+
+    @property
+    @cleanup_after_exception
+    def binning_modes(self) -> list[str]:
+        """Get the binning modes (like Average or Sum) supported by the camera with the current binning selector."""
+        self.__check_camera_and_vmbsyst()
+        if not self.binning_available:
+            return []
+        return [
+            str(entry)
+            for entry in self.__camera.BinningHorizontalMode.get_available_entries()
+        ]
+
+    @property
+    @cleanup_after_exception
+    def binning_mode(self) -> str:
+        """Get the current binning mode (Average or Sum)."""
+        self.__check_camera_and_vmbsyst()
+        return str(self.__camera.BinningHorizontalMode.get())
+
+    @binning_mode.setter
+    @cleanup_after_exception
+    def binning_mode(self, value: str):
+        """Set the binning mode (Average or Sum)."""
+        self.__check_camera_and_vmbsyst()
+        if not self.binning_available:
+            raise RuntimeError("Binning mode can't be changed on this camera.")
+        self.__camera.BinningHorizontalMode.set(value)
+        vertical_mode = self.__get_feature("BinningVerticalMode")
+        if vertical_mode is not None and vertical_mode.is_writeable():
+            vertical_mode.set(value)
+
+    @property
+    @cleanup_after_exception
+    def decimation_available(self) -> bool:
+        """Get whether decimation is available on the camera."""
+        self.__check_camera_and_vmbsyst()
+        horizontal = self.__get_feature("DecimationHorizontal")
+        vertical = self.__get_feature("DecimationVertical")
+        return (
+            horizontal is not None
+            and vertical is not None
+            and horizontal.is_writeable()
+            and vertical.is_writeable()
+        )
+
+    @property
+    @cleanup_after_exception
+    def decimation_factor(self) -> int:
+        """Get the current decimation factor (the same is used horizontally and vertically)."""
+        self.__check_camera_and_vmbsyst()
+        if not self.decimation_available:
+            return 1
+        return self.__camera.DecimationHorizontal.get()
+
+    @property
+    @cleanup_after_exception
+    def decimation_factor_range(self) -> tuple[int, int]:
+        """Get the range of decimation factors supported by the camera in the current configuration."""
+        self.__check_camera_and_vmbsyst()
+        if not self.decimation_available:
+            return (1, 1)
+        horizontal_range = self.__camera.DecimationHorizontal.get_range()
+        vertical_range = self.__camera.DecimationVertical.get_range()
+        return (
+            max(horizontal_range[0], vertical_range[0]),
+            min(horizontal_range[1], vertical_range[1]),
+        )
+
+    @decimation_factor.setter
+    @cleanup_after_exception
+    def decimation_factor(self, value: int):
+        """Set the decimation factor (the same is used horizontally and vertically)."""
+        self.__check_camera_and_vmbsyst()
+        factor_range = self.decimation_factor_range
+        if value < factor_range[0] or value > factor_range[1]:
+            raise ValueError(
+                f"Decimation factor must be within the range {factor_range}."
+            )
+        if not self.decimation_available:
+            return  # Only a factor of 1 can get here, which is what the camera already does
+        self.__camera.DecimationHorizontal.set(value)
+        self.__camera.DecimationVertical.set(value)
+
     @property
     @cleanup_after_exception
     def color_available(self) -> bool:
@@ -327,6 +471,13 @@ class AlviumCamera:
         self.__check_camera_and_vmbsyst()
         self.__camera.stop_streaming()
 
+    def __get_feature(self, name: str):
+        """Get a feature of the camera by its name, or None if the camera doesn't have it."""
+        try:
+            return self.__camera.get_feature_by_name(name)
+        except VmbFeatureError:
+            return None
+
     def __check_vmbsyst_instance(self):
         """Check if the VmbSystem instance is initialized."""
         if not self.__vmb_syst:
@@ -1,15 +1,169 @@
 # flake8: noqa: E501
-from vmbpy import Frame
+from vmbpy import Frame, FrameStatus
 from click import echo, secho, getchar  # , launch
 import time
 import cv2
 import threading
 import queue
 from camera import AlviumCamera
+from downscale import SoftwareDownscaler
+from scheduling import ThreadTuning
+
+
+class FrameRecorder:
+    """Receive the frames from the camera and write them to a video file from a separate writer thread."""
+
+    def __init__(
+        self,
+        camera: AlviumCamera,
+        output: str,
+        downscaler: SoftwareDownscaler = None,
+        capture_tuning: ThreadTuning = None,
+        writer_tuning: ThreadTuning = None,
+        measure_latency: bool = False,
+    ):
+        """Initialize"""
+        self.camera = camera
+        self.output = output
+        self.downscaler = downscaler if downscaler else SoftwareDownscaler()
+        self.capture_tuning = (
+            capture_tuning if capture_tuning else ThreadTuning("capture")
+        )
+        self.writer_tuning = writer_tuning if writer_tuning else ThreadTuning("writer")
+        self.frame_size = self.downscaler.output_size(
+            camera.image_width, camera.image_height
+        )
+        self.codec = (
+            "XVID" if output.endswith(".avi") else "mp4v"
+        )  # Choose codec based on file extension
+        self.count = 0  # Counter for the number of frames recorded
+        self.incomplete = 0  # Counter for the frames that the camera didn't fully send
+        self.latencies = (
+            [] if measure_latency else None
+        )  # (host time, camera timestamp) in ns of each frame received
+        self.__fps = camera.current_fps
+        self.__is_color = camera.color_available
+        # Frames received from the camera until they are written to the video file
+        self.__frame_queue = queue.Queue()
+        self.__writer_thread = None
+        self.__writer_ready = threading.Event()
+        self.__writer_error = None
+        self.__capture_thread_tuned = False
+
+    @property
+    def frames_left(self) -> int:
+        """Get the number of frames received that are not written yet."""
+        return self.__frame_queue.qsize()
+
+    @property
+    def is_writing(self) -> bool:
+        """Check if the writer thread is still writing frames."""
+        return self.__writer_thread is not None and self.__writer_thread.is_alive()
+
+    def start(self):
+        """Start the writer thread and then the streaming of the camera."""
+        self.__writer_thread = threading.Thread(target=self.__write_frames)
+        self.__writer_thread.start()
+        self.__writer_ready.wait()
+        if self.__writer_error:
+            self.__writer_thread.join()
+            raise self.__writer_error
+        try:
+            self.camera.start_recording(self.__record_frame)
+        except Exception as e:
+            # End the writer thread, otherwise it waits for frames forever
+            self.__frame_queue.put(None)
+            self.__writer_thread.join()
+            raise e
+
+    def stop(self):
+        """Stop the streaming of the camera, the frames already received will still be written."""
+        self.camera.stop_recording()
+        self.__frame_queue.put(
+            None
+        )  # Signal the thread that this was the last frame to write
+
+    def wait(self):
+        """Wait for the writer thread to write all the frames received."""
+        self.__writer_thread.join()
+
+    def __record_frame(self, frame: Frame):
+        """
+        Callback function to handle each frame received from the camera.
+        It holds the GIL as little as possible: the buffer is copied (numpy releases the GIL for it) because the camera reuses it as soon as we return, and everything else is done by the writer thread.
+        """
+        # Read first so that nothing below counts in the latency
+        host_time = time.perf_counter_ns()
+        if not self.__capture_thread_tuned:
+            self.__capture_thread_tuned = True
+            # The callback thread is created by vmbpy, so we can only tune it from here
+            self.capture_tuning.apply()
+        if self.latencies is not None:
+            timestamp = frame.get_timestamp()
+            # Frames without timestamp can't be used for the latency
+            if timestamp is not None:
+                self.latencies.append((host_time, timestamp))
+        if frame.get_status() != FrameStatus.Complete:
+            self.incomplete += 1
+        self.__frame_queue.put_nowait(frame.as_numpy_ndarray().copy())
+
+    def __write_frames(self):
+        """Thread function to write frames to the video file."""
+        # The encoder threads are created with the video writer, so they inherit the settings of this thread
+        try:
+            self.writer_tuning.apply()
+            out = cv2.VideoWriter(
+                self.output,
+                cv2.VideoWriter_fourcc(*self.codec),
+                self.__fps,
+                self.frame_size,
+            )  # Initialize the video writer with the specified codec and resolution
+            # OpenCV doesn't raise when the file can't be opened
+            if not out.isOpened():
+                self.__writer_error = RuntimeError(
+                    f"Can't open '{self.output}' to write a video with the {self.codec} codec."
+                )
+                return
+        except Exception as e:
+            self.__writer_error = e
+            return
+        finally:
+            self.__writer_ready.set()
+
+        video_not_ended = True
+        while video_not_ended:  # Loop through the queue until the recording is stopped
+            try:
+                raw = self.__frame_queue.get()
+                if raw is None:  # Check for the end of the recording
+                    video_not_ended = False
+                else:
+                    raw = self.downscaler(
+                        raw
+                    )  # Downscale the raw frame in software if the camera couldn't do it
+                    if self.__is_color:
+                        img = cv2.cvtColor(
+                            raw, cv2.COLOR_BAYER_RG2RGB
+                        )  # Convert Bayer format to RGB if the camera is color
+                    else:
+                        img = cv2.cvtColor(
+                            raw, cv2.COLOR_GRAY2RGB
+                        )  # Convert Mono format to RGB if the camera is mno
+                    out.write(img)  # Write the frame to the video file
+                    self.count += 1
+            except Exception as e:
+                secho(f"Error writing frame: {e}", fg="red")
+        out.release()  # Close the video file
 
 
-def record_video(camera: AlviumCamera, output: str):
-    """Record a video with the camera."""
+def record_video(
+    camera: AlviumCamera,
+    output: str,
+    downscaler: SoftwareDownscaler = None,
+    capture_tuning: ThreadTuning = None,
+    writer_tuning: ThreadTuning = None,
+):
+    """Record a video with the camera. The frames go through the software downscaler (if any) before being encoded."""
+    recorder = FrameRecorder(camera, output, downscaler, capture_tuning, writer_tuning)
 
     # Countdown before recording starts
     for i in range(3, 0, -1):
@@ -29,67 +183,14 @@ def record_video(camera: AlviumCamera, output: str):
         fg="yellow",
     )
 
-    # Initialize the video writer
-    count = 0  # Counter for the number of frames recorded
-    codec = (
-        "XVID" if output.endswith(".avi") else "mp4v"
-    )  # Choose codec based on file extension
-    out = cv2.VideoWriter(
-        output,
-        cv2.VideoWriter_fourcc(*codec),
-        camera.current_fps,
-        (camera.image_width, camera.image_height),
-    )  # Initialize the video writer with the specified codec and resolution
-
-    # Queue to save frames received from the camera until they are written to the video file
-    frame_queue = queue.Queue()
-
-    # Check if the camera supports color
-    is_color = camera.color_available  # Check if the camera supports color
-
-    def record_frame(frame: Frame):
-        """Callback function to handle each frame received from the camera."""
-        frame_queue.put_nowait(
-            frame
-        )  # It just add the frame in the queue for it to be written later
-
-    def write_frames():
-        """Thread function to write frames to the video file."""
-        nonlocal out, count, is_color
-        video_not_ended = True
-
-        while video_not_ended:  # Loop through the queue until the recording is stopped
-            try:
-                frame = frame_queue.get()
-                if frame is None:  # Check for the end of the recording
-                    video_not_ended = False
-                else:
-                    if is_color:
-                        img = cv2.cvtColor(
-                            frame.as_numpy_ndarray(), cv2.COLOR_BAYER_RG2RGB
-                        )  # Convert Bayer format to RGB if the camera is color
-                    else:
-                        img = cv2.cvtColor(
-                            frame.as_numpy_ndarray(), cv2.COLOR_GRAY2RGB
-                        )  # Convert Mono format to RGB if the camera is mno
-                    out.write(img)  # Write the frame to the video file
-                    count += 1
-            except Exception as e:
-                secho(f"Error writing frame: {e}", fg="red")
-
-    # Start the video writer thread to write frames to the video file
-    video_writer_thread = threading.Thread(target=write_frames)
-    video_writer_thread.start()
-
-    # Start the camera and register the callback function to handle frames
-    camera.start_recording(record_frame)
+    # Start the video writer thread and the camera
+    recorder.start()
 
     # Wait for any key to stop recording
     getchar()
 
     # Stop the recording when a key as been pressed
-    camera.stop_recording()
-    frame_queue.put(None)  # Signal the thread that this was the last frame to write
+    recorder.stop()
 
     # Prompt the user that the recording has stopped, but we need to wait faor the video writer thread to finish
     secho("\033[A\33[2K\033[A\33[2K\033[A\33[2K ● RECORDED", fg="bright_black")
@@ -100,12 +201,12 @@ def record_video(camera: AlviumCamera, output: str):
     )
 
     # Wait for the video writer thread to finish writing frames
-    # video_writer_thread.join()
+    # recorder.wait()
     echo()  # Move to the next line after the loop
-    while video_writer_thread.is_alive():
-        secho(f"\033[A\33[2K{frame_queue.qsize()} frames left...", fg="bright_black")
+    while recorder.is_writing:
+        secho(f"\033[A\33[2K{recorder.frames_left} frames left...", fg="bright_black")
         time.sleep(0.1)
-    out.release()  # Close the video file
+    recorder.wait()  # The video file is closed by the writer thread
 
     # Indicate that the video has been saved successfully and show som infos
     secho(
@@ -120,18 +221,20 @@ def record_video(camera: AlviumCamera, output: str):
         bold=True,
     )
     secho(f"Output file path: {output}", fg="green")
-    secho(f"Video codec: {codec}", fg="green")
+    secho(f"Video codec: {recorder.codec}", fg="green")
     secho(
         f"Video colors : {'RGB (Colored)' if camera.color_available else 'Mono (Shades of gray)'}",
         fg="green",
     )
     secho(
-        f"Video resolution: {camera.image_width}x{camera.image_height} px",
+        f"Video resolution: {recorder.frame_size[0]}x{recorder.frame_size[1]} px",
         fg="green",
     )
     secho(f"Video framerate: {camera.current_fps:.2f} fps", fg="green")
-    secho(f"Video duration: {count / camera.current_fps:.2f} s", fg="green")
-    secho(f"Total frames recorded: {count}", fg="green")
+    secho(f"Video duration: {recorder.count / camera.current_fps:.2f} s", fg="green")
+    secho(f"Total frames recorded: {recorder.count}", fg="green")
+    if recorder.incomplete:
+        secho(f"Incomplete frames: {recorder.incomplete}", fg="green")
     echo()
     # if confirm("Do you want to open the video file?", default=False):
     #     launch(output)
@@ -1,8 +1,156 @@
 # flake8: noqa: E501
+import functools
 import click
 from camera import AlviumCamera
 from configure import configure_camera, print_infos
 from capture import record_video
+from downscale import (
+    SoftwareDownscaler,
+    DOWNSCALE_METHODS,
+    BINNING_MODES,
+    BINNING_SELECTORS,
+)
+from scheduling import (
+    ThreadTuning,
+    parse_cores,
+    set_switch_interval,
+    warn_if_unsupported,
+)
+from benchmark import benchmark_capture
+
+
+def downscale_options(func):
+    """Decorator adding the options to downscale the image, on-sensor or in software."""
+    options = [
+        click.option(
+            "--binning",
+            "-b",
+            type=click.BOOL,
+            default=False,
+            help="To activate 2x2 binning (shortcut for `--downscale-factor 2 --downscale-method binning`)",
+        ),
+        click.option(
+            "--downscale-factor",
+            "-df",
+            type=click.IntRange(1, 8),
+            default=1,
+            help="Factor by which the image is downscaled (the max resolution will be divided by it)",
+        ),
+        click.option(
+            "--downscale-method",
+            "-dm",
+            type=click.Choice(DOWNSCALE_METHODS),
+            default="binning",
+            help="Combine the pixels (binning) or skip them (decimation), done on-sensor if the camera supports it, in software otherwise",
+        ),
+        click.option(
+            "--binning-mode",
+            "-bm",
+            type=click.Choice(BINNING_MODES),
+            default="Average",
+            help="How the binned pixels are combined",
+        ),
+        click.option(
+            "--binning-selector",
+            "-bs",
+            type=click.Choice(BINNING_SELECTORS),
+            default="Sensor",
+            help="Preferred hardware binning, the other one is used if it can't do the asked factor",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def scheduling_options(func):
+    """
+    Decorator adding the options to tune the scheduling of the capture and writer threads.
+    The command receives them as `capture_tuning` and `writer_tuning` (see `ThreadTuning`) and `switch_interval`.
+    """
+
+    @functools.wraps(func)
+    def wrapper(
+        *args,
+        capture_cores,
+        writer_cores,
+        capture_priority,
+        writer_priority,
+        **kwargs,
+    ):
+        capture_tuning = ThreadTuning("capture", capture_cores, capture_priority)
+        writer_tuning = ThreadTuning("writer", writer_cores, writer_priority)
+        warn_if_unsupported(capture_tuning, writer_tuning)
+        return func(
+            *args, capture_tuning=capture_tuning, writer_tuning=writer_tuning, **kwargs
+        )
+
+    options = [
+        click.option(
+            "--capture-cores",
+            "-cc",
+            callback=parse_cores,
+            help="CPU cores (like `0,2-3`) to pin the camera callback thread to",
+        ),
+        click.option(
+            "--writer-cores",
+            "-wc",
+            callback=parse_cores,
+            help="CPU cores (like `0,2-3`) to pin the video writer and encoder threads to",
+        ),
+        click.option(
+            "--capture-priority",
+            "-cp",
+            type=click.IntRange(-20, 19),
+            help="Niceness of the camera callback thread (negative values need the permission to raise priorities)",
+        ),
+        click.option(
+            "--writer-priority",
+            "-wp",
+            type=click.IntRange(-20, 19),
+            help="Niceness of the video writer thread (negative values need the permission to raise priorities)",
+        ),
+        click.option(
+            "--switch-interval",
+            "-si",
+            type=click.FloatRange(0, min_open=True),
+            help="How often (in ms) the GIL is taken back from the writer thread, lower values let the callback run sooner",
+        ),
+    ]
+    for option in reversed(options):
+        wrapper = option(wrapper)
+    return wrapper
+
+
+def setup_camera(
+    camera: AlviumCamera,
+    shutter_speed,
+    height,
+    width,
+    binning,
+    downscale_factor,
+    downscale_method,
+    binning_mode,
+    binning_selector,
+) -> SoftwareDownscaler:
+    """Configure the camera with the options of a command, print the resulting config and return the software downscaler to use."""
+    if binning and downscale_factor == 1:
+        downscale_factor = 2
+        downscale_method = "binning"
+    downscaler = configure_camera(
+        camera,
+        shutter_speed,
+        height,
+        width,
+        downscale_method,
+        downscale_factor,
+        binning_mode,
+        binning_selector,
+    )
+    click.echo()
+    print_infos(camera, downscaler)
+    click.echo()
+    return downscaler
 
 
 @click.group()
@@ -15,13 +163,7 @@ def cli():
 @click.option(
     "--shutter-speed", "-ss", type=click.FLOAT, default=5000, help="Shutter speed in µs"
 )
-@click.option(
-    "--binning",
-    "-b",
-    type=click.BOOL,
-    default=False,
-    help="To activate 2x2 sensor binning (the max resolution will be cut in half)",
-)
+@downscale_options
 @click.option(
     "--height", "-h", type=click.INT, default=1248, help="Image height in pixels"
 )
@@ -29,34 +171,26 @@ def cli():
     "--width", "-w", type=click.INT, default=1632, help="Image width in pixels"
 )
 # @click.option("--output", "-o", default="video.mp4", help="Output video file name")
-def infos(shutter_speed, binning, height, width):
+def infos(shutter_speed, height, width, **downscaling):
     """
     Configure the camera with the given options and then display the current config.
     """
     with AlviumCamera() as camera:
-        configure_camera(camera, shutter_speed, binning, height, width)
-        click.echo()
-        print_infos(camera)
-        click.echo()
+        setup_camera(camera, shutter_speed, height, width, **downscaling)
 
 
 @cli.command(short_help="Record a video with the camera")
 @click.option(
     "--shutter-speed", "-ss", type=click.FLOAT, default=5000, help="Shutter speed in µs"
 )
-@click.option(
-    "--binning",
-    "-b",
-    type=click.BOOL,
-    default=False,
-    help="To activate 2x2 sensor binning (the max resolution will be cut in half)",
-)
+@downscale_options
 @click.option(
     "--height", "-h", type=click.INT, default=1248, help="Image height in pixels"
 )
 @click.option(
     "--width", "-w", type=click.INT, default=1632, help="Image width in pixels"
 )
+@scheduling_options
 @click.option(
     "--output",
     "-o",
@@ -64,16 +198,70 @@ def infos(shutter_speed, binning, height, width):
     default="video.avi",
     help="Output video file name",
 )
-def record(shutter_speed, binning, height, width, output):
+def record(
+    shutter_speed,
+    height,
+    width,
+    capture_tuning,
+    writer_tuning,
+    switch_interval,
+    output,
+    **downscaling,
+):
     """
     Configure the camera with the given options and then start the recording of a video.
     """
     with AlviumCamera() as camera:
-        configure_camera(camera, shutter_speed, binning, height, width)
-        click.echo()
-        print_infos(camera)
-        click.echo()
-        record_video(camera, output)
+        downscaler = setup_camera(camera, shutter_speed, height, width, **downscaling)
+        previous_interval = set_switch_interval(switch_interval)
+        try:
+            record_video(camera, output, downscaler, capture_tuning, writer_tuning)
+        finally:
+            set_switch_interval(previous_interval)
+
+
+@cli.command(short_help="Compare the capture jitter with and without tuning")
+@click.option(
+    "--shutter-speed", "-ss", type=click.FLOAT, default=5000, help="Shutter speed in µs"
+)
+@downscale_options
+@click.option(
+    "--height", "-h", type=click.INT, default=1248, help="Image height in pixels"
+)
+@click.option(
+    "--width", "-w", type=click.INT, default=1632, help="Image width in pixels"
+)
+@scheduling_options
+@click.option(
+    "--duration",
+    "-d",
+    type=click.FloatRange(0, min_open=True),
+    default=10,
+    help="Duration in s of each of the two recordings",
+)
+def benchmark(
+    shutter_speed,
+    height,
+    width,
+    capture_tuning,
+    writer_tuning,
+    switch_interval,
+    duration,
+    **downscaling,
+):
+    """
+    Configure the camera with the given options, then record a throwaway video with the default scheduling and another one with the given CPU affinity, priority and switch interval settings, and compare the callback latency jitter of both.
+    """
+    with AlviumCamera() as camera:
+        downscaler = setup_camera(camera, shutter_speed, height, width, **downscaling)
+        benchmark_capture(
+            camera,
+            downscaler,
+            duration,
+            capture_tuning,
+            writer_tuning,
+            switch_interval,
+        )
 
 
 if __name__ == "__main__":
@@ -1,20 +1,98 @@
 # flake8: noqa: E501
 from camera import AlviumCamera
 from click import secho
+from downscale import SoftwareDownscaler
 
 
-def configure_camera(camera: AlviumCamera, shutter_speed, binning, height, width):
-    """Configure the camera settings and display the changes that are made if the setting can't be put to the given value."""
+def configure_downscaling(
+    camera: AlviumCamera, method, factor, mode, selector
+) -> SoftwareDownscaler:
+    """
+    Configure the camera to downscale the frames on-sensor if it can, otherwise return the software downscaler that must be applied to each frame.
+    The software downscaler returned is an identity one if the camera does all the work.
+    """
 
-    # Set the binning mode
-    if camera.binning_available:
-        camera.binning = binning
-    elif binning == True:
-        secho(
-            "Binning is not available on this camera. Setting binning to False.",
-            fg="bright_black",
-        )
-        binning = False
+    # Reset the hardware downscaling so that the camera reports its full capabilities
+    # The camera keeps its settings until it is power-cycled, so each binning selector may still be set by a previous run
+    # The active selector first, it can't be changed while binning
+    camera.binning_factor = 1
+    selectors = camera.binning_selectors
+    for binning_selector in selectors:
+        camera.binning_selector = binning_selector
+        camera.binning_factor = 1
+    if selector in selectors:
+        camera.binning_selector = selector
+    camera.decimation_factor = 1
+    if factor == 1:
+        return SoftwareDownscaler()
+
+    # Try the hardware binning with the chosen selector first, then with the other ones available
+    if method == "binning":
+        for binning_selector in sorted(selectors, key=lambda s: s != selector):
+            camera.binning_selector = binning_selector
+            factor_range = camera.binning_factor_range
+            if (
+                camera.binning_available
+                and mode in camera.binning_modes
+                and factor_range[0] <= factor <= factor_range[1]
+            ):
+                camera.binning_mode = mode
+                camera.binning_factor = factor
+                if binning_selector != selector:
+                    secho(
+                        f"{selector} binning x{factor} ({mode}) is not available on this camera. "
+                        f"Using {binning_selector} binning instead.",
+                        fg="bright_black",
+                    )
+                return SoftwareDownscaler()
+        if selector in selectors:
+            camera.binning_selector = selector
+
+    # Try the hardware decimation
+    if method == "decimation":
+        factor_range = camera.decimation_factor_range
+        if camera.decimation_available and factor_range[0] <= factor <= factor_range[1]:
+            camera.decimation_factor = factor
+            return SoftwareDownscaler()
+
+    # Fallback to the software downscaling, done on each frame before it is encoded
+    secho(
+        f"Hardware {method} x{factor} is not available on this camera. "
+        f"Using software {method} instead.",
+        fg="bright_black",
+    )
+    return SoftwareDownscaler(method, factor, mode, bayer=camera.color_available)
+
+
+def configure_camera(
+    camera: AlviumCamera,
+    shutter_speed,
+    height,
+    width,
+    downscale_method="binning",
+    downscale_factor=1,
+    binning_mode="Average",
+    binning_selector="Sensor",
+) -> SoftwareDownscaler:
+    """
+    Configure the camera settings and display the changes that are made if the setting can't be put to the given value.
+    Return the software downscaler to apply to each frame (see `configure_downscaling`).
+    """
+
+    # Set the binning or decimation
+    downscaler = configure_downscaling(
+        camera, downscale_method, downscale_factor, binning_mode, binning_selector
+    )
+
+    # When downscaling in software, the camera has to capture a region big enough to give the asked size once downscaled
+    # The messages below still report the sizes once downscaled, as the user gave them
+    factor = downscaler.factor
+    sensor_height = height * factor
+    sensor_width = width * factor
+
+    def output_size() -> tuple[int, int]:
+        """Get the size (width, height) of the video, once the current camera image is downscaled."""
+        return downscaler.output_size(camera.image_width, camera.image_height)
 
     # Check if the shutter speed is within the camera's shutter speed range
     # If not it is automatically set to the minimum value allowed by the camera
@@ -33,41 +111,41 @@ def configure_camera(camera: AlviumCamera, shutter_speed, binning, height, width
     # If not, set them to the maximum values allowed by the camera
     height_range = camera.image_height_range
     width_range = camera.image_width_range
-    if height < height_range[0] or height > height_range[1]:
+    if sensor_height < height_range[0] or sensor_height > height_range[1]:
         camera.image_height = height_range[1]
         secho(
             f"Height {height} pixels is out of range. "
-            f"Setting to maximum {camera.image_height} pixels.",
+            f"Setting to maximum {output_size()[1]} pixels.",
             fg="bright_black",
         )
     else:
-        camera.image_height = height
-    if width < width_range[0] or width > width_range[1]:
+        camera.image_height = sensor_height
+    if sensor_width < width_range[0] or sensor_width > width_range[1]:
         camera.image_width = width_range[1]
         secho(
             f"Width {width} pixels is out of range. "
-            f"Setting to maximum {camera.image_width} pixels.",
+            f"Setting to maximum {output_size()[0]} pixels.",
             fg="bright_black",
         )
     else:
-        camera.image_width = width
+        camera.image_width = sensor_width
 
     # Check if the height and width are multiples of the increments required by the camera
     # If not, set them to the nearest multiple of the increment
     height_increment = camera.image_height_increment
-    if height % height_increment != 0:
-        camera.image_height = (height // height_increment) * height_increment
+    if sensor_height % height_increment != 0:
+        camera.image_height = (sensor_height // height_increment) * height_increment
         secho(
             f"Height {height} pixels is not a multiple of {height_increment}. "
-            f"Setting to {height} pixels.",
+            f"Setting to {output_size()[1]} pixels.",
             fg="bright_black",
         )
     width_increment = camera.image_width_increment
-    if width % width_increment != 0:
-        camera.image_width = (width // width_increment) * width_increment
+    if sensor_width % width_increment != 0:
+        camera.image_width = (sensor_width // width_increment) * width_increment
         secho(
             f"Width {width} pixels is not a multiple of {width_increment}. "
-            f"Setting to {width} pixels.",
+            f"Setting to {output_size()[0]} pixels.",
             fg="bright_black",
         )
 
@@ -83,9 +161,13 @@ def configure_camera(camera: AlviumCamera, shutter_speed, binning, height, width
     camera.offset_x = offset_x
     camera.offset_y = offset_y
 
+    return downscaler
 
-def print_infos(camera: AlviumCamera):
+
+def print_infos(camera: AlviumCamera, downscaler: SoftwareDownscaler = None):
     """Print the current camera configuration."""
+    if downscaler is None:
+        downscaler = SoftwareDownscaler()
     secho("- Current camera configuration -", fg="blue", bold=True)
     secho(
         f"Pixels : {'Colored (Bayer)' if camera.color_available else 'Gray (Mono)'}",
@@ -94,8 +176,21 @@ def print_infos(camera: AlviumCamera):
     secho(f"Framerate: {camera.current_fps:.2f} fps", fg="blue")
     secho(f"Shutter speed: {camera.shutter_speed} µs", fg="blue")
     secho(
-        f"Binning: {'Enabled (2x2) (Average)' if camera.binning else 'Disabled'}",
+        f"Binning: {f'Enabled ({camera.binning_factor}x{camera.binning_factor}) ({camera.binning_selector}) ({camera.binning_mode})' if camera.binning else 'Disabled'}",
+        fg="blue",
+    )
+    secho(
+        f"Decimation: {f'Enabled ({camera.decimation_factor}x{camera.decimation_factor})' if camera.decimation_factor > 1 else 'Disabled'}",
+        fg="blue",
+    )
+    secho(
+        f"Software downscaling: {'Disabled' if downscaler.is_identity else f'Enabled ({downscaler.method}) ({downscaler.factor}x{downscaler.factor})'}",
         fg="blue",
     )
     secho(f"Image size: {camera.image_width}x{camera.image_height} px", fg="blue")
+    if not downscaler.is_identity:
+        output_width, output_height = downscaler.output_size(
+            camera.image_width, camera.image_height
+        )
+        secho(f"Output size: {output_width}x{output_height} px", fg="blue")
     secho(f"Offsets: {camera.offset_x}x{camera.offset_y} px", fg="blue")
@@ -0,0 +1,78 @@
+# flake8: noqa: E501
+import numpy as np
+
+DOWNSCALE_METHODS = ("binning", "decimation")
+BINNING_MODES = ("Average", "Sum")
+BINNING_SELECTORS = ("Sensor", "Digital")
+
+
+class SoftwareDownscaler:
+    """
+    Downscale raw frames in software, used when the camera can't do the binning or decimation on-sensor.
+    When the frames are in a Bayer format, pixels are only combined with pixels of the same color so the output is still a valid Bayer image.
+    """
+
+    def __init__(
+        self,
+        method: str = "binning",
+        factor: int = 1,
+        mode: str = "Average",
+        bayer: bool = False,
+    ):
+        """Initialize"""
+        if method not in DOWNSCALE_METHODS:
+            raise ValueError(f"Downscale method must be one of {DOWNSCALE_METHODS}.")
+        if mode not in BINNING_MODES:
+            raise ValueError(f"Binning mode must be one of {BINNING_MODES}.")
+        if factor < 1:
+            raise ValueError("Downscale factor must be greater or equal to 1.")
+        self.method = method
+        self.factor = factor
+        self.mode = mode
+        self.bayer = bayer
+
+    @property
+    def is_identity(self) -> bool:
+        """Check if the downscaler leaves the frames untouched."""
+        return self.factor == 1
+
+    def output_size(self, width: int, height: int) -> tuple[int, int]:
+        """Get the size (width, height) of the frames once downscaled, the remaining pixels that don't fill a whole block being cropped."""
+        if self.is_identity:
+            return width, height
+        if self.bayer:
+            block = 2 * self.factor
+            return (width // block) * 2, (height // block) * 2
+        return width // self.factor, height // self.factor
+
+    def __call__(self, img: np.ndarray) -> np.ndarray:
+        """Downscale a raw frame (as given by `Frame.as_numpy_ndarray()`) and return it as a 2D array."""
+        if img.ndim == 3:
+            img = img[:, :, 0]  # Mono and Bayer frames only have one channel
+        if self.is_identity:
+            return img
+        f = self.factor
+        width, height = self.output_size(img.shape[1], img.shape[0])
+        # Split the image in blocks so that the `axes` index the pixels to combine
+        # For Bayer, the 2x2 color pattern is kept in its own axes (2 and 5) so colors never mix
+        cropped = img[: height * f, : width * f]
+        if self.bayer:
+            blocks = cropped.reshape(height // 2, f, 2, width // 2, f, 2)
+            axes = (1, 4)
+        else:
+            blocks = cropped.reshape(height, f, width, f)
+            axes = (1, 3)
+
+        if self.method == "decimation":
+            out = blocks.take(0, axis=axes[1]).take(0, axis=axes[0])
+        else:
+            total = blocks.sum(axis=axes, dtype=np.uint32)
+            if self.mode == "Average":
+                count = f * f
+                # Rounded integer average
+                out = (total + count // 2) // count
+            else:
+                # Saturate like the sensor would
+                out = np.minimum(total, np.iinfo(img.dtype).max)
+            out = out.astype(img.dtype)
+        return np.ascontiguousarray(out.reshape(height, width))
@@ -0,0 +1,154 @@
+# flake8: noqa: E501
+import os
+import sys
+import threading
+from click import secho, BadParameter
+
+# Thread scheduling is done with the os module on Linux and with the Win32 API on Windows
+# Elsewhere (like on macOS) there is no way to target a single thread, so the settings are ignored
+SCHEDULING_SUPPORTED = sys.platform.startswith("linux") or sys.platform == "win32"
+
+
+def parse_cores(ctx, param, value) -> set[int] | None:
+    """Click callback to parse a list of CPU cores like `0,2-3` into a set of core numbers."""
+    if value is None:
+        return None
+    cores = set()
+    try:
+        for part in value.split(","):
+            if "-" in part:
+                start, end = (int(bound) for bound in part.split("-"))
+                if start > end:
+                    raise BadParameter(
+                        f"'{part}' is a reversed range of cores, write it '{end}-{start}'."
+                    )
+                cores.update(range(start, end + 1))
+            else:
+                cores.add(int(part))
+    except ValueError:
+        raise BadParameter(f"'{value}' is not a list of cores like '0,2-3'.")
+    if not cores or min(cores) < 0:
+        raise BadParameter(f"'{value}' is not a list of cores like '0,2-3'.")
+    cpu_count = os.cpu_count()
+    if cpu_count is not None and max(cores) >= cpu_count:
+        raise BadParameter(
+            f"This computer only has the cores 0 to {cpu_count - 1}, '{value}' is out of range."
+        )
+    return cores
+
+
+def warn_if_unsupported(*tunings: "ThreadTuning"):
+    """Warn the user if some scheduling settings are given on a platform where they can't be applied."""
+    if not SCHEDULING_SUPPORTED and any(not tuning.is_default for tuning in tunings):
+        secho(
+            f"CPU affinity and thread priorities are only supported on Linux and Windows, they will be ignored on this platform ({sys.platform}).",
+            fg="yellow",
+        )
+
+
+def _windows_kernel32():
+    """Load the Win32 functions used to change the scheduling of the calling thread."""
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.GetCurrentThread.restype = wintypes.HANDLE
+    kernel32.SetThreadAffinityMask.argtypes = [wintypes.HANDLE, ctypes.c_size_t]
+    kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
+    kernel32.SetThreadPriority.argtypes = [wintypes.HANDLE, ctypes.c_int]
+    kernel32.SetThreadPriority.restype = wintypes.BOOL
+    return kernel32
+
+
+def _set_thread_affinity(cores: set[int]):
+    """Pin the calling thread to the given CPU cores."""
+    if sys.platform == "win32":
+        import ctypes
+
+        if max(cores) >= 64:
+            raise ValueError("only the cores 0 to 63 can be used on Windows")
+        kernel32 = _windows_kernel32()
+        mask = sum(1 << core for core in cores)
+        if not kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), mask):
+            raise ctypes.WinError(ctypes.get_last_error())
+    else:
+        os.sched_setaffinity(threading.get_native_id(), cores)
+
+
+def _set_thread_priority(priority: int):
+    """Set the priority of the calling thread from a niceness (-20 is the highest priority, 19 the lowest)."""
+    if sys.platform == "win32":
+        import ctypes
+
+        # Map the niceness to the Win32 thread priorities (from THREAD_PRIORITY_LOWEST to THREAD_PRIORITY_HIGHEST)
+        if priority <= -11:
+            win_priority = 2
+        elif priority < 0:
+            win_priority = 1
+        elif priority == 0:
+            win_priority = 0
+        elif priority <= 10:
+            win_priority = -1
+        else:
+            win_priority = -2
+        kernel32 = _windows_kernel32()
+        if not kernel32.SetThreadPriority(kernel32.GetCurrentThread(), win_priority):
+            raise ctypes.WinError(ctypes.get_last_error())
+    else:
+        # On Linux each thread has its own niceness, set by its thread id
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), priority)
+
+
+class ThreadTuning:
+    """
+    Scheduling settings (CPU affinity and priority) for a thread.
+    They are applied from inside the thread itself, so it also works on threads that we don't create (like the vmbpy callback one).
+    """
+
+    def __init__(self, name: str, cores: set[int] = None, priority: int = None):
+        """Initialize"""
+        self.name = name
+        self.cores = cores
+        self.priority = priority  # Niceness, from -20 (highest priority) to 19
+
+    @property
+    def is_default(self) -> bool:
+        """Check if there is nothing to change on the thread."""
+        return self.cores is None and self.priority is None
+
+    def apply(self):
+        """
+        Apply the settings to the calling thread, the settings that can't be applied are only reported.
+        Nothing is done on the unsupported platforms, `warn_if_unsupported` is there to tell the user once.
+        """
+        if not SCHEDULING_SUPPORTED:
+            return
+        if self.cores is not None:
+            try:
+                _set_thread_affinity(self.cores)
+            except (OSError, OverflowError, ValueError) as e:
+                secho(
+                    f"Can't pin the {self.name} thread to the cores {sorted(self.cores)}: {e}",
+                    fg="bright_black",
+                )
+        if self.priority is not None:
+            try:
+                _set_thread_priority(self.priority)
+            except OSError as e:
+                secho(
+                    f"Can't set the priority of the {self.name} thread to {self.priority}: {e}",
+                    fg="bright_black",
+                )
+
+
+def set_switch_interval(interval: float | None) -> float:
+    """
+    Set how often (in ms) the thread holding the GIL is asked to release it, a lower value lets the capture callback get the GIL sooner.
+    Return the previous interval (in ms) so that it can be restored.
+    """
+    previous = sys.getswitchinterval() * 1000
+    if interval is not None:
+        if interval <= 0:
+            raise ValueError("Switch interval must be greater than 0.")
+        sys.setswitchinterval(interval / 1000)
+    return previous